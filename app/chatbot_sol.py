@@ -2,11 +2,16 @@
 Smart Contract Audit Chatbot Module
 Implements RAG-based chatbot for smart contract analysis and auditing
 """
+import asyncio
 import json
+import re
+from collections import OrderedDict, deque
 from datetime import datetime
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Deque, Dict, List, Optional
 
 # Third-party imports
+import tiktoken
 from langchain.prompts import (ChatPromptTemplate, HumanMessagePromptTemplate,
                                SystemMessagePromptTemplate)
 from langchain.schema import AIMessage, BaseMessage, HumanMessage, SystemMessage
@@ -14,7 +19,8 @@ from langchain_openai import ChatOpenAI
 
 # Local application imports
 from app.config import get_settings
-from app.ingestion_sol import ingestion_service
+from app.ingestion_sol import get_ingestion_service
+from app.semantic_cache import SemanticCache
 
 
 class SmartContractAuditBot:
@@ -22,6 +28,7 @@ class SmartContractAuditBot:
 
     def __init__(self):
         self.settings = get_settings()
+        self.ingestion_service = get_ingestion_service()
         self.llm = ChatOpenAI(
             openai_api_key=self.settings.openai_api_key,
             model_name=self.settings.openai_model,
@@ -29,11 +36,33 @@ class SmartContractAuditBot:
             max_tokens=self.settings.max_tokens
         )
 
-        # Conversation history
-        self.conversation_history: List[BaseMessage] = []
+        # Conversation history, bounded with a running character count
+        self.conversation_history: Deque[BaseMessage] = deque(
+            maxlen=self.settings.conversation_history_size
+        )
+        self._history_chars = 0
+
+        # Cache of retrieved context keyed by query embedding similarity
+        self.semantic_cache = SemanticCache(
+            dimension=self.settings.embedding_dimension,
+            capacity=self.settings.semantic_cache_size,
+            threshold=self.settings.semantic_cache_threshold,
+            path=self.settings.semantic_cache_path or None,
+            quantize=self.settings.semantic_cache_quantize
+        )
+
+        # Ingestion version the cached contexts were retrieved at
+        self._context_version = self.ingestion_service.ingest_version
+
+        # Exact-match cache of normalized query -> context, checked before embedding
+        self._exact_cache: "OrderedDict[str, str]" = OrderedDict()
+
+        # Tokenizer for trimming contract excerpts, created on first use
+        self._encoding = None
 
         # System prompt for smart contract auditing
         self.system_prompt = self._create_system_prompt()
+        self.audit_prompt = self._create_audit_prompt()
 
     def _create_system_prompt(self) -> str:
         """Create comprehensive system prompt for smart contract auditing"""
@@ -72,17 +101,17 @@ SECURITY FOCUS AREAS:
 
 Always be thorough, precise, and educational in your responses. When analyzing provided contract code, reference specific functions, variables, and patterns you observe."""
 
-    def _create_audit_prompt(self, user_query: str, context: str) -> ChatPromptTemplate:
+    def _create_audit_prompt(self) -> ChatPromptTemplate:
         """
-        Create a ChatPromptTemplate for the audit bot, escaping curly braces.
+        Create the ChatPromptTemplate for the audit bot once, with {context} and {query}
+        as real placeholders so per-call values never need brace escaping.
         """
-        safe_user_query = user_query.replace("{", "{{").replace("}", "}}")
-        safe_context = context.replace("{", "{{").replace("}", "}}")
+        safe_system_prompt = self.system_prompt.replace("{", "{{").replace("}", "}}")
 
-        system_template = f"""{self.system_prompt}
+        system_template = f"""{safe_system_prompt}
 
 RELEVANT CONTRACT CONTEXT:
-{safe_context}
+{{context}}
 
 Based on the above context and your expertise, provide a comprehensive audit response to the user's query."""
 
@@ -96,12 +125,68 @@ Focus on security implications, best practices, and actionable recommendations."
             HumanMessagePromptTemplate.from_template(human_template)
         ])
 
-    async def get_relevant_context(self, query: str) -> str:
-        """Retrieve relevant contract context using RAG"""
+    def _trim_to_tokens(self, text: str, max_tokens: int) -> str:
+        """Trim text to at most max_tokens tokens of the configured model"""
+        if self._encoding is None:
+            try:
+                self._encoding = tiktoken.encoding_for_model(self.settings.openai_model)
+            except KeyError:
+                self._encoding = tiktoken.get_encoding("cl100k_base")
+
+        tokens = self._encoding.encode(text, disallowed_special=())
+        if len(tokens) <= max_tokens:
+            return text
+        return self._encoding.decode(tokens[:max_tokens]) + "..."
+
+    def _append_history(self, message: BaseMessage) -> None:
+        """Append a message to the conversation history, keeping the character count in sync"""
+        if len(self.conversation_history) == self.conversation_history.maxlen:
+            self._history_chars -= len(self.conversation_history[0].content)
+        self.conversation_history.append(message)
+        self._history_chars += len(message.content)
+
+    def _cache_context(self, cache_key: str, context: str) -> None:
+        """Store context in the exact-match LRU cache"""
+        self._exact_cache[cache_key] = context
+        self._exact_cache.move_to_end(cache_key)
+        if len(self._exact_cache) > self.settings.context_cache_size:
+            self._exact_cache.popitem(last=False)
+
+    def _invalidate_stale_context(self) -> None:
+        """Drop cached context retrieved before the latest ingestion"""
+        if self._context_version != self.ingestion_service.ingest_version:
+            self.semantic_cache.clear()
+            self._exact_cache.clear()
+            self._context_version = self.ingestion_service.ingest_version
+
+    async def get_relevant_context(self, query: str, filter_by_patterns: bool = False) -> str:
+        """Retrieve relevant contract context using RAG, reusing cached context for similar queries"""
+        self._invalidate_stale_context()
+        version = self._context_version
+        # Filtered and unfiltered searches for the same text return different context
+        cache_key = f"{int(filter_by_patterns)}:" + re.sub(r'\s+', ' ', query.strip().lower())
+        cached_context = self._exact_cache.get(cache_key)
+        if cached_context is not None:
+            self._exact_cache.move_to_end(cache_key)
+            return cached_context
+
         try:
-            search_results = await ingestion_service.search_contracts(
+            query_embedding = SemanticCache.normalize(
+                await self.ingestion_service.query_embeddings.aembed_query(query)
+            )
+            # A similar query can select different pattern tags, so filtered
+            # context is only reused for the exact same query text
+            if not filter_by_patterns:
+                cached_context = self.semantic_cache.lookup(query_embedding)
+                if cached_context is not None:
+                    self._cache_context(cache_key, cached_context)
+                    return cached_context
+
+            search_results = await self.ingestion_service.search_contracts(
                 query=query,
-                k=self.settings.top_k_results
+                k=self.settings.top_k_results,
+                embedding=query_embedding.tolist(),
+                filter_by_patterns=filter_by_patterns
             )
 
             if not search_results:
@@ -124,7 +209,13 @@ Code:
 """
                 context_parts.append(context_part)
 
-            return "\n".join(context_parts)
+            context = "\n".join(context_parts)
+            # Don't cache a result that may predate a contract ingested during the search
+            if version == self.ingestion_service.ingest_version:
+                if not filter_by_patterns:
+                    self.semantic_cache.add(query_embedding, context)
+                self._cache_context(cache_key, context)
+            return context
 
         except Exception as e:
             # Consider more specific logging here
@@ -133,13 +224,17 @@ Code:
     async def chat(self, user_message: str, include_context: bool = True) -> Dict[str, Any]:
         """Main chat interface with RAG capabilities"""
         try:
-            context = ""
+            # Start the retrieval round-trip first and prepare history while it is in flight
+            context_task = None
             if include_context:
-                context = await self.get_relevant_context(user_message)
+                context_task = asyncio.create_task(self.get_relevant_context(user_message, filter_by_patterns=True))
+
+            history_tail = list(self.conversation_history)[-10:]  # Keep last 10 messages
+
+            context = await context_task if context_task else ""
 
             if context and context != "No relevant contract context found in the database.":
-                prompt = self._create_audit_prompt(user_message, context)
-                messages_to_send = prompt.format_messages(query=user_message)
+                messages_to_send = self.audit_prompt.format_messages(query=user_message, context=context)
             else:
                 messages_to_send = [
                     SystemMessage(content=self.system_prompt),
@@ -147,13 +242,13 @@ Code:
                 ]
 
             # Combine with recent conversation history
-            full_messages = self.conversation_history[-10:] + messages_to_send  # Keep last 10 interactions
+            full_messages = history_tail + messages_to_send
 
             response = await self.llm.ainvoke(full_messages)
 
             # Update conversation history
-            self.conversation_history.append(HumanMessage(content=user_message))
-            self.conversation_history.append(response) # Assuming response is an AIMessage or compatible
+            self._append_history(HumanMessage(content=user_message))
+            self._append_history(response) # Assuming response is an AIMessage or compatible
 
             return {
                 "success": True,
@@ -171,15 +266,20 @@ Code:
 
     async def analyze_contract_security(self, contract_content: str) -> Dict[str, Any]:
         """Perform comprehensive security analysis of a contract"""
-        # Ingest the contract for context (temporary)
-        # Note: Consider if this temporary ingestion is always desired or if it should be more persistent.
-        temp_file_path = f"temp_analysis_{datetime.now().timestamp()}.sol"
-        await ingestion_service.ingest_contract(temp_file_path, contract_content)
-
+        # Ingest the contract for context, skipping contracts that were already ingested.
+        # Hashing and tokenizing large contracts run in worker threads to keep the loop free.
+        contract_hash = await asyncio.to_thread(self.ingestion_service.generate_file_hash, contract_content)
+        if not self.ingestion_service.is_known_contract(contract_hash):
+            temp_file_path = f"temp_analysis_{contract_hash[:16]}.sol"
+            await self.ingestion_service.ingest_contract(temp_file_path, contract_content, contract_hash)
+
+        contract_excerpt = await asyncio.to_thread(
+            self._trim_to_tokens, contract_content, self.settings.contract_excerpt_tokens
+        )
         security_query = f"""
         Perform a comprehensive security audit of this smart contract:
 
-        {contract_content[:2000]}...
+        {contract_excerpt}
 
         Focus on:
         1. Critical vulnerabilities (reentrancy, access control, etc.)
@@ -189,18 +289,17 @@ Code:
         """
 
         context = await self.get_relevant_context(security_query)
-        prompt = self._create_audit_prompt(security_query, context)
 
         try:
             response = await self.llm.ainvoke(
-                prompt.format_messages(query=security_query)
+                self.audit_prompt.format_messages(query=security_query, context=context)
             )
 
             return {
                 "success": True,
                 "analysis": response.content,
                 "timestamp": datetime.now().isoformat(),
-                "contract_hash": ingestion_service.generate_file_hash(contract_content)
+                "contract_hash": contract_hash
             }
 
         except Exception as e:
@@ -211,10 +310,13 @@ Code:
 
     async def suggest_improvements(self, contract_content: str) -> Dict[str, Any]:
         """Suggest specific improvements for a contract"""
+        contract_excerpt = await asyncio.to_thread(
+            self._trim_to_tokens, contract_content, self.settings.contract_excerpt_tokens
+        )
         improvement_query = f"""
         Analyze this smart contract and suggest specific improvements:
 
-        {contract_content[:1500]}...
+        {contract_excerpt}
 
         Focus on:
         1. Code optimization and gas efficiency
@@ -225,11 +327,10 @@ Code:
         """
 
         context = await self.get_relevant_context(improvement_query)
-        prompt = self._create_audit_prompt(improvement_query, context)
 
         try:
             response = await self.llm.ainvoke(
-                prompt.format_messages(query=improvement_query)
+                self.audit_prompt.format_messages(query=improvement_query, context=context)
             )
 
             return {
@@ -259,11 +360,10 @@ Code:
 
         # Context search tailored to the vulnerability type
         context = await self.get_relevant_context(f"{vulnerability_type} vulnerability smart contract")
-        prompt = self._create_audit_prompt(explanation_query, context)
 
         try:
             response = await self.llm.ainvoke(
-                prompt.format_messages(query=explanation_query)
+                self.audit_prompt.format_messages(query=explanation_query, context=context)
             )
 
             return {
@@ -281,16 +381,20 @@ Code:
 
     def clear_conversation(self):
         """Clear conversation history"""
-        self.conversation_history = []
+        self.conversation_history.clear()
+        self._history_chars = 0
 
     def get_conversation_summary(self) -> Dict[str, Any]:
         """Get summary of current conversation"""
         return {
             "message_count": len(self.conversation_history),
             "last_interaction": datetime.now().isoformat() if self.conversation_history else None,
-            "conversation_length": sum(len(msg.content) for msg in self.conversation_history)
+            "conversation_length": self._history_chars
         }
 
 
-# Global chatbot instance (consider if this is the best approach for your application lifecycle)
-audit_bot = SmartContractAuditBot()
\ No newline at end of file
+# Shared chatbot instance, created on first use rather than at import time
+@lru_cache(maxsize=1)
+def get_audit_bot() -> SmartContractAuditBot:
+    """Get the shared audit bot instance"""
+    return SmartContractAuditBot()
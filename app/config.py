@@ -31,24 +31,51 @@ class Settings(BaseSettings):
     allowed_file_extensions: list = [".sol", ".txt"]
     rate_limit_requests: int = 100
     rate_limit_window: int = 3600  # 1 hour
+    rate_limit_max_clients: int = 100_000  # In-process limiter entries kept before LRU eviction
+    redis_url: str = ""  # e.g. redis://localhost:6379/0; empty keeps rate limiting in-process
+    redis_timeout: float = 0.25  # Seconds to wait on Redis before using the in-process fallback
     
     # LLM Settings
     openai_model: str = "gpt-4"
     max_tokens: int = 2000
     temperature: float = 0.1
+    conversation_history_size: int = 20  # Messages retained (human + AI)
+    contract_excerpt_tokens: int = 2000  # Contract tokens included in analysis prompts
     
     # Chunking Settings
     chunk_size: int = 1000
     chunk_overlap: int = 200
+    ingestion_concurrency: int = 10
+    parser_processes: int = 4  # Upper bound on worker processes for batch parsing
+    
+    # Embedding Settings
+    embedding_provider: str = "openai"  # "openai" or "huggingface" (local model)
+    openai_embedding_model: str = "text-embedding-ada-002"
+    local_embedding_model: str = "sentence-transformers/all-MiniLM-L6-v2"
+    local_embedding_batch_size: int = 64
+    embedding_cache_dir: str = ".embcache"  # Empty string disables the chunk embedding cache
     
     # Vector Database Settings
-    embedding_dimension: int = 1536
+    embedding_dimension: int = 1536  # 384 for all-MiniLM-L6-v2 / bge-small
     index_dimension: int = 1536
     index_metric: str = "cosine"
     top_k_results: int = 5
+    upsert_batch_size: int = 100
     top_k: int = 10
     min_score: float = 0.5
     
+    # Semantic Cache Settings
+    semantic_cache_threshold: float = 0.95
+    semantic_cache_size: int = 1024
+    semantic_cache_path: str = ".semantic_cache"  # Empty string disables persistence
+    semantic_cache_quantize: bool = False  # Store cached embeddings as int8
+    context_cache_size: int = 256
+    
+    # Response Cache Settings
+    stats_cache_ttl: int = 5  # Seconds /health and /stats results are reused
+    search_cache_ttl: int = 60  # Seconds /search results are reused
+    response_cache_size: int = 1024  # In-process cached responses
+    
     class Config:
         env_file = ".env"
         case_sensitive = False
@@ -5,25 +5,126 @@ Handles parsing, chunking, and embedding of Solidity smart contracts
 """
 import os
 import re
+import asyncio
 import hashlib
-from typing import List, Dict, Any, Optional
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Iterator, List, Dict, Any, Optional, Sequence, Union
 from pathlib import Path
 import aiofiles
-from langchain.text_splitter import RecursiveCharacterTextSplitter
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
 from langchain_openai import OpenAIEmbeddings
-from langchain_pinecone import PineconeVectorStore
 from pinecone import Pinecone
 from app.config import get_settings
 
+try:
+    import hyperscan
+except ImportError:  # Optional accelerator; fall back to per-pattern regex search
+    hyperscan = None
+
+try:
+    import ahocorasick
+except ImportError:  # Optional accelerator; fall back to substring search
+    ahocorasick = None
+
 class SolidityParser:
     """Parse and extract information from Solidity contracts"""
     
+    # Common security-related patterns, matched case-insensitively.
+    # Literal alternatives are keywords; the rest need a regex engine.
+    SECURITY_KEYWORDS = {
+        "reentrancy_guard": ("nonReentrant", "ReentrancyGuard"),
+        "access_control": ("onlyOwner", "onlyAdmin"),
+        "safe_math": ("SafeMath", ".add(", ".sub(", ".mul(", ".div("),
+        "external_calls": (".call(", ".delegatecall(", ".staticcall("),
+        "time_dependency": ("block.timestamp",),
+        "randomness": ("block.difficulty", "blockhash("),
+        "overflow_checks": ()
+    }
+    SECURITY_REGEXES = {
+        "access_control": r'require\s*\(\s*msg\.sender',
+        "time_dependency": r'now\s',
+        "overflow_checks": r'require\s*\([^)]*\+|require\s*\([^)]*\-'
+    }
+    
+    # Natural-language query terms that name a tagged construct. Vulnerability names
+    # ("reentrancy", "overflow") are deliberately absent: those tags mark mitigations,
+    # and filtering on them would hide the vulnerable contracts being asked about.
+    SECURITY_QUERY_TERMS = {
+        "external call": "external_calls",
+        "delegatecall": "external_calls",
+        "timestamp": "time_dependency",
+        "randomness": "randomness"
+    }
+    
     def __init__(self):
+        self.pragma_pattern = re.compile(r'^\s*pragma\s+solidity\s+([^;]+);', re.MULTILINE)
+        self.import_pattern = re.compile(r'^\s*import\s+[^;]+;', re.MULTILINE)
         self.contract_pattern = re.compile(r'contract\s+(\w+).*?\{', re.DOTALL)
         self.function_pattern = re.compile(r'function\s+(\w+)\s*\([^)]*\)\s*(?:public|private|internal|external)?\s*(?:view|pure|payable)?\s*(?:returns\s*\([^)]*\))?\s*\{', re.DOTALL)
         self.modifier_pattern = re.compile(r'modifier\s+(\w+)\s*\([^)]*\)\s*\{', re.DOTALL)
         self.event_pattern = re.compile(r'event\s+(\w+)\s*\([^)]*\);')
         
+        # Full pattern per name: escaped keywords plus any regex alternatives
+        self.security_patterns = {
+            name: '|'.join(
+                [re.escape(keyword) for keyword in keywords]
+                + ([self.SECURITY_REGEXES[name]] if name in self.SECURITY_REGEXES else [])
+            )
+            for name, keywords in self.SECURITY_KEYWORDS.items()
+        }
+        self.security_pattern_names = list(self.security_patterns)
+        self.security_regexes_compiled = {
+            name: re.compile(pattern, re.IGNORECASE)
+            for name, pattern in self.SECURITY_REGEXES.items()
+        }
+        self.lowered_keywords = {
+            name: tuple(keyword.lower() for keyword in keywords)
+            for name, keywords in self.SECURITY_KEYWORDS.items()
+        }
+        self.security_database = self._compile_security_database()
+        self.keyword_automaton = self._build_keyword_automaton()
+        # Hyperscan scratch space cannot be shared by concurrent scans
+        self._thread_local = threading.local()
+    
+    def _compile_security_database(self):
+        """Compile all security patterns into one Hyperscan database, if available"""
+        if hyperscan is None:
+            return None
+        
+        patterns = list(self.security_patterns.values())
+        database = hyperscan.Database()
+        database.compile(
+            expressions=[pattern.encode() for pattern in patterns],
+            ids=list(range(len(patterns))),
+            elements=len(patterns),
+            flags=[hyperscan.HS_FLAG_CASELESS | hyperscan.HS_FLAG_SINGLEMATCH] * len(patterns)
+        )
+        return database
+    
+    def _get_scratch(self):
+        """Get this thread's Hyperscan scratch space, allocating it on first use"""
+        scratch = getattr(self._thread_local, "scratch", None)
+        if scratch is None:
+            scratch = hyperscan.Scratch(self.security_database)
+            self._thread_local.scratch = scratch
+        return scratch
+    
+    def _build_keyword_automaton(self):
+        """Build an Aho-Corasick automaton over the lowercased keywords, if available"""
+        if ahocorasick is None:
+            return None
+        
+        automaton = ahocorasick.Automaton()
+        for name, keywords in self.lowered_keywords.items():
+            for keyword in keywords:
+                automaton.add_word(keyword, name)
+        automaton.make_automaton()
+        return automaton
+        
     def extract_metadata(self, content: str) -> Dict[str, Any]:
         """Extract metadata from Solidity contract"""
         metadata = {
@@ -36,12 +137,12 @@ class SolidityParser:
         }
         
         # Extract pragma
-        pragma_match = re.search(r'pragma\s+solidity\s+([^;]+);', content)
+        pragma_match = self.pragma_pattern.search(content)
         if pragma_match:
             metadata["pragma"] = pragma_match.group(1).strip()
         
         # Extract imports
-        import_matches = re.findall(r'import\s+[^;]+;', content)
+        import_matches = self.import_pattern.findall(content)
         metadata["imports"] = [imp.strip() for imp in import_matches]
         
         # Extract contracts
@@ -64,24 +165,169 @@ class SolidityParser:
     
     def identify_security_patterns(self, content: str) -> List[str]:
         """Identify potential security-related patterns in the contract"""
-        security_patterns = []
-        
-        # Check for common security patterns
-        patterns = {
-            "reentrancy_guard": r'nonReentrant|ReentrancyGuard',
-            "access_control": r'onlyOwner|onlyAdmin|require\s*\(\s*msg\.sender',
-            "safe_math": r'SafeMath|\.add\(|\.sub\(|\.mul\(|\.div\(',
-            "external_calls": r'\.call\(|\.delegatecall\(|\.staticcall\(',
-            "time_dependency": r'block\.timestamp|now\s',
-            "randomness": r'block\.difficulty|blockhash\(',
-            "overflow_checks": r'require\s*\([^)]*\+|require\s*\([^)]*\-'
+        if self.security_database is not None:
+            # Single pass over the text for all patterns
+            matched = set()
+            
+            def on_match(pattern_id, start, end, flags, context):
+                matched.add(pattern_id)
+            
+            self.security_database.scan(
+                content.encode(),
+                match_event_handler=on_match,
+                scratch=self._get_scratch()
+            )
+            return [name for i, name in enumerate(self.security_pattern_names) if i in matched]
+        
+        # Keywords in one pass over the lowercased text, regexes only where still needed
+        lowered = content.lower()
+        if self.keyword_automaton is not None:
+            matched = {name for _, name in self.keyword_automaton.iter(lowered)}
+        else:
+            matched = {
+                name for name, keywords in self.lowered_keywords.items()
+                if any(keyword in lowered for keyword in keywords)
+            }
+        
+        for pattern_name, pattern in self.security_regexes_compiled.items():
+            if pattern_name not in matched and pattern.search(content):
+                matched.add(pattern_name)
+        
+        return [name for name in self.security_pattern_names if name in matched]
+    
+    def identify_query_security_patterns(self, query: str) -> List[str]:
+        """Identify security pattern tags a user's query explicitly names.
+
+        Only literal code keywords and construct names count; the code regexes are
+        skipped since they misfire on prose (e.g. "now ").
+        """
+        lowered = query.lower()
+        matched = {
+            name for name, keywords in self.lowered_keywords.items()
+            if any(keyword in lowered for keyword in keywords)
         }
+        matched.update(name for term, name in self.SECURITY_QUERY_TERMS.items() if term in lowered)
+        return [name for name in self.security_pattern_names if name in matched]
+
+def generate_file_hash(content: Union[str, bytes]) -> str:
+    """Generate hash for file content to avoid duplicates"""
+    if isinstance(content, str):
+        content = content.encode()
+    return hashlib.sha256(content).hexdigest()
+
+def fast_chunk(
+    text: str,
+    size: int = 1000,
+    overlap: int = 200,
+    separators: Sequence[str] = ("\n\n", "\n", " ")
+) -> Iterator[str]:
+    """Split text into overlapping chunks of at most `size` characters.
+
+    Each chunk ends just after the last separator in the back half of the
+    window (trying separators in order), or at the hard size limit if none
+    is found. Only (start, end) offsets are computed before slicing.
+    """
+    length = len(text)
+    start = 0
+    while start < length:
+        end = min(start + size, length)
+        if end < length:
+            # Snapping too early would make consecutive chunks mostly overlap
+            min_end = start + max(overlap, size // 2)
+            for separator in separators:
+                index = text.rfind(separator, min_end, end)
+                if index != -1:
+                    end = index + len(separator)
+                    break
         
-        for pattern_name, pattern in patterns.items():
-            if re.search(pattern, content, re.IGNORECASE):
-                security_patterns.append(pattern_name)
+        chunk = text[start:end]
+        if chunk.strip():
+            yield chunk
         
-        return security_patterns
+        if end >= length:
+            break
+        # Always advance, even if the overlap would cover the whole chunk
+        start = max(end - overlap, start + 1)
+
+def create_cached_embeddings(embeddings, cache_dir: str, provider: str) -> CacheBackedEmbeddings:
+    """Wrap an embedding model in a content-addressed disk cache.
+
+    Identical chunks (shared imports, SafeMath copies, boilerplate) are only embedded once;
+    the namespace keeps vectors from different models apart.
+    """
+    model_name = getattr(embeddings, "model", None) or getattr(embeddings, "model_name", "")
+    # LocalFileStore only accepts keys made of [a-zA-Z0-9_.-/]
+    namespace = re.sub(r"[^a-zA-Z0-9_.\-/]", "-", f"{provider}-{model_name}")
+    return CacheBackedEmbeddings.from_bytes_store(
+        embeddings,
+        LocalFileStore(cache_dir),
+        namespace=namespace
+    )
+
+# Per-process parser used by process_contract (created on first use in each worker)
+_parser: Optional[SolidityParser] = None
+
+def process_contract(
+    file_path: str,
+    content: str,
+    chunk_size: int,
+    chunk_overlap: int,
+    file_hash: Optional[str] = None
+) -> Dict[str, Any]:
+    """Parse, hash and chunk a single Solidity contract.
+
+    Module-level and free of service state so it can run in a ProcessPoolExecutor.
+    """
+    global _parser
+    try:
+        if _parser is None:
+            _parser = SolidityParser()
+        
+        # Extract metadata
+        metadata = _parser.extract_metadata(content)
+        security_patterns = _parser.identify_security_patterns(content)
+        
+        # Generate file hash
+        file_hash = file_hash or generate_file_hash(content)
+        
+        # Split content into chunks
+        chunks = list(fast_chunk(content, chunk_size, chunk_overlap))
+        
+        # Prepare documents for vector store
+        documents = []
+        for i, chunk in enumerate(chunks):
+            doc_metadata = {
+                "file_path": file_path,
+                "file_hash": file_hash,
+                "chunk_index": i,
+                "total_chunks": len(chunks),
+                "contracts": metadata["contracts"],
+                "functions": metadata["functions"][:10],  # Limit to avoid metadata size issues
+                "security_patterns": security_patterns,
+                "pragma": metadata["pragma"],
+                "content_type": "solidity_contract"
+            }
+            documents.append({
+                "content": chunk,
+                "metadata": doc_metadata
+            })
+        
+        return {
+            "success": True,
+            "file_path": file_path,
+            "file_hash": file_hash,
+            "chunks_count": len(chunks),
+            "metadata": metadata,
+            "security_patterns": security_patterns,
+            "documents": documents
+        }
+        
+    except Exception as e:
+        return {
+            "success": False,
+            "file_path": file_path,
+            "error": str(e)
+        }
 
 class ContractIngestionService:
     """Service for ingesting and processing Solidity contracts"""
@@ -89,93 +335,165 @@ class ContractIngestionService:
     def __init__(self):
         self.settings = get_settings()
         self.parser = SolidityParser()
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=self.settings.chunk_size,
-            chunk_overlap=self.settings.chunk_overlap,
-            separators=["\n\n", "\n", " ", ""]
-        )
-        self.embeddings = OpenAIEmbeddings(
-            openai_api_key=self.settings.openai_api_key,
-            model="text-embedding-ada-002"
-        )
+        self._process_pool: Optional[ProcessPoolExecutor] = None
+        # Queries use the model directly: the cache wrapper has no native async
+        # embed_query, and repeated queries are already served by the chatbot caches
+        self.query_embeddings = self._create_base_embeddings()
+        self.embeddings = self._create_embeddings(self.query_embeddings)
         
         # Initialize Pinecone
         self.pc = Pinecone(api_key=self.settings.pinecone_api_key)
-        self.vector_store = None
+        self.index = None
+        
+        # Hashes of contracts known to be in the vector database
+        self._known_hashes: set = set()
+        
+        # Bumped whenever vectors are added, so cached search context can be invalidated
+        self.ingest_version = 0
+        
+    def _create_embeddings(self, embeddings):
+        """Wrap the embedding model used for documents in a content-addressed disk cache"""
+        if not self.settings.embedding_cache_dir:
+            return embeddings
+        
+        return create_cached_embeddings(
+            embeddings,
+            self.settings.embedding_cache_dir,
+            self.settings.embedding_provider
+        )
+    
+    def _create_base_embeddings(self):
+        """Create the embedding model selected by the embedding provider setting"""
+        if self.settings.embedding_provider == "huggingface":
+            # Local model: no network round-trip per chunk, but a different vector
+            # dimension, so it needs its own Pinecone index
+            from langchain_community.embeddings import HuggingFaceEmbeddings
+            
+            return HuggingFaceEmbeddings(
+                model_name=self.settings.local_embedding_model,
+                encode_kwargs={
+                    "batch_size": self.settings.local_embedding_batch_size,
+                    "normalize_embeddings": True
+                }
+            )
+        
+        if self.settings.embedding_provider != "openai":
+            raise ValueError(f"Unsupported embedding provider: {self.settings.embedding_provider}")
         
+        return OpenAIEmbeddings(
+            openai_api_key=self.settings.openai_api_key,
+            model=self.settings.openai_embedding_model
+        )
+    
     async def initialize_vector_store(self):
-        """Initialize Pinecone vector store"""
+        """Initialize the Pinecone index handle"""
         try:
             # Check if index exists, create if not
             existing_indexes = [index.name for index in self.pc.list_indexes()]
             
             if self.settings.pinecone_index_name not in existing_indexes:
-                self.pc.create_index(
-                    name=self.settings.pinecone_index_name,
-                    dimension=self.settings.embedding_dimension,
-                    metric="cosine",
-                    spec={
-                        "serverless": {
-                            "cloud": "aws",
-                            "region": "us-east-1"
+                try:
+                    self.pc.create_index(
+                        name=self.settings.pinecone_index_name,
+                        dimension=self.settings.embedding_dimension,
+                        metric="cosine",
+                        spec={
+                            "serverless": {
+                                "cloud": "aws",
+                                "region": "us-east-1"
+                            }
                         }
-                    }
-                )
+                    )
+                except Exception:
+                    # Several workers start at once; another may have created it first
+                    if self.settings.pinecone_index_name not in [index.name for index in self.pc.list_indexes()]:
+                        raise
             
-            self.vector_store = PineconeVectorStore(
-                index_name=self.settings.pinecone_index_name,
-                embedding=self.embeddings
-            )
+            # Talk to the index directly; one handle keeps its connection pool for the process lifetime
+            self.index = self.pc.Index(self.settings.pinecone_index_name)
             
         except Exception as e:
             raise Exception(f"Failed to initialize vector store: {str(e)}")
     
-    def generate_file_hash(self, content: str) -> str:
+    def generate_file_hash(self, content: Union[str, bytes]) -> str:
         """Generate hash for file content to avoid duplicates"""
-        return hashlib.md5(content.encode()).hexdigest()
+        return generate_file_hash(content)
+    
+    def _get_process_pool(self) -> ProcessPoolExecutor:
+        """Lazily create the process pool used for batch contract parsing"""
+        if self._process_pool is None:
+            # spawn avoids forking a parent that already holds network clients and threads
+            self._process_pool = ProcessPoolExecutor(
+                max_workers=max(1, min(os.cpu_count() or 1, self.settings.parser_processes)),
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._process_pool
+    
+    def is_known_contract(self, file_hash: str) -> bool:
+        """Check the local record of ingested hashes without a Pinecone round-trip"""
+        return file_hash in self._known_hashes
+    
+    async def contract_exists(self, file_hash: str) -> bool:
+        """Check whether a contract with this hash is already in the vector database"""
+        if file_hash in self._known_hashes:
+            return True
+        
+        # Chunk ids are derived from the file hash, so a point lookup replaces a similarity search
+        response = await asyncio.to_thread(self.index.fetch, ids=[f"{file_hash}-0"])
+        if response.vectors:
+            self._known_hashes.add(file_hash)
+            return True
+        return False
     
-    async def process_contract_file(self, file_path: str, content: str) -> Dict[str, Any]:
-        """Process a single Solidity contract file"""
+    async def upsert_documents(self, documents: List[Dict[str, Any]]) -> int:
+        """Embed processed chunks and upsert them into Pinecone, returning the number added"""
+        if not documents:
+            return 0
+        
+        embeddings = await self.embeddings.aembed_documents([doc["content"] for doc in documents])
+        
+        vectors = []
+        for doc, embedding in zip(documents, embeddings):
+            metadata = doc["metadata"]
+            # Pinecone rejects null metadata values; chunk text is stored under
+            # the same "text" key LangChain used so existing vectors stay readable
+            vector_metadata = {key: value for key, value in metadata.items() if value is not None}
+            vector_metadata["text"] = doc["content"]
+            vectors.append((
+                f"{metadata['file_hash']}-{metadata['chunk_index']}",
+                embedding,
+                vector_metadata
+            ))
+        
+        await asyncio.to_thread(
+            self.index.upsert,
+            vectors=vectors,
+            batch_size=self.settings.upsert_batch_size,
+            show_progress=False
+        )
+        self.ingest_version += 1
+        return len(vectors)
+    
+    def shutdown(self) -> None:
+        """Release worker processes"""
+        if self._process_pool is not None:
+            self._process_pool.shutdown(wait=False, cancel_futures=True)
+            self._process_pool = None
+    
+    async def process_contract_file(
+        self,
+        file_path: str,
+        content: str,
+        file_hash: Optional[str] = None,
+        use_process_pool: bool = False
+    ) -> Dict[str, Any]:
+        """Process a single Solidity contract file in a worker thread, or a worker process for batches"""
+        args = (file_path, content, self.settings.chunk_size, self.settings.chunk_overlap, file_hash)
         try:
-            # Extract metadata
-            metadata = self.parser.extract_metadata(content)
-            security_patterns = self.parser.identify_security_patterns(content)
-            
-            # Generate file hash
-            file_hash = self.generate_file_hash(content)
-            
-            # Split content into chunks
-            chunks = self.text_splitter.split_text(content)
-            
-            # Prepare documents for vector store
-            documents = []
-            for i, chunk in enumerate(chunks):
-                doc_metadata = {
-                    "file_path": file_path,
-                    "file_hash": file_hash,
-                    "chunk_index": i,
-                    "total_chunks": len(chunks),
-                    "contracts": metadata["contracts"],
-                    "functions": metadata["functions"][:10],  # Limit to avoid metadata size issues
-                    "security_patterns": security_patterns,
-                    "pragma": metadata["pragma"],
-                    "content_type": "solidity_contract"
-                }
-                documents.append({
-                    "content": chunk,
-                    "metadata": doc_metadata
-                })
-            
-            return {
-                "success": True,
-                "file_path": file_path,
-                "file_hash": file_hash,
-                "chunks_count": len(chunks),
-                "metadata": metadata,
-                "security_patterns": security_patterns,
-                "documents": documents
-            }
-            
+            if use_process_pool:
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self._get_process_pool(), process_contract, *args)
+            return await asyncio.to_thread(process_contract, *args)
         except Exception as e:
             return {
                 "success": False,
@@ -183,48 +501,51 @@ class ContractIngestionService:
                 "error": str(e)
             }
     
-    async def ingest_contract(self, file_path: str, content: str) -> Dict[str, Any]:
+    async def ingest_contract(
+        self,
+        file_path: str,
+        content: str,
+        file_hash: Optional[str] = None,
+        use_process_pool: bool = False
+    ) -> Dict[str, Any]:
         """Ingest a single contract into the vector database"""
-        if not self.vector_store:
+        if not self.index:
             await self.initialize_vector_store()
         
-        # Process the contract
-        result = await self.process_contract_file(file_path, content)
-        
-        if not result["success"]:
-            return result
+        file_hash = file_hash or self.generate_file_hash(content)
         
         try:
-            # Check if file already exists
-            existing_docs = self.vector_store.similarity_search(
-                query=f"file_hash:{result['file_hash']}",
-                k=1,
-                filter={"file_hash": result["file_hash"]}
-            )
-            
-            if existing_docs:
+            # Check if file already exists before doing any parsing work
+            if await self.contract_exists(file_hash):
                 return {
                     "success": True,
                     "message": "Contract already exists in database",
-                    "file_hash": result["file_hash"],
+                    "file_hash": file_hash,
                     "action": "skipped"
                 }
-            
+        except Exception as e:
+            return {
+                "success": False,
+                "error": f"Failed to ingest contract: {str(e)}"
+            }
+        
+        # Process the contract
+        result = await self.process_contract_file(file_path, content, file_hash, use_process_pool)
+        
+        if not result["success"]:
+            return result
+        
+        try:
             # Add documents to vector store
-            texts = [doc["content"] for doc in result["documents"]]
-            metadatas = [doc["metadata"] for doc in result["documents"]]
-            
-            self.vector_store.add_texts(
-                texts=texts,
-                metadatas=metadatas
-            )
+            chunks_added = await self.upsert_documents(result["documents"])
+            self._known_hashes.add(file_hash)
             
             return {
                 "success": True,
                 "message": "Contract successfully ingested",
                 "file_path": file_path,
                 "file_hash": result["file_hash"],
-                "chunks_added": len(texts),
+                "chunks_added": chunks_added,
                 "metadata": result["metadata"],
                 "security_patterns": result["security_patterns"],
                 "action": "ingested"
@@ -237,34 +558,152 @@ class ContractIngestionService:
             }
     
     async def ingest_multiple_contracts(self, contracts: List[Dict[str, str]]) -> List[Dict[str, Any]]:
-        """Ingest multiple contracts"""
-        results = []
+        """Ingest multiple contracts concurrently, bounded by the ingestion concurrency setting"""
+        if not self.index:
+            await self.initialize_vector_store()
         
-        for contract in contracts:
-            result = await self.ingest_contract(
+        semaphore = asyncio.Semaphore(self.settings.ingestion_concurrency)
+        
+        async def ingest_one(contract: Dict[str, str]) -> Dict[str, Any]:
+            async with semaphore:
+                return await self.ingest_contract(
+                    contract["file_path"],
+                    contract["content"],
+                    contract.get("file_hash"),
+                    use_process_pool=True
+                )
+        
+        results = await asyncio.gather(
+            *[ingest_one(contract) for contract in contracts],
+            return_exceptions=True
+        )
+        
+        return [
+            {
+                "success": False,
+                "file_path": contract["file_path"],
+                "error": f"Failed to ingest contract: {str(result)}"
+            } if isinstance(result, Exception) else result
+            for contract, result in zip(contracts, results)
+        ]
+    
+    async def ingest_contracts_bulk(self, contracts: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        """Ingest multiple contracts with a single batched embedding and upsert pass"""
+        if not self.index:
+            await self.initialize_vector_store()
+        
+        # Parse all files in parallel worker processes
+        processed = await asyncio.gather(*[
+            self.process_contract_file(
                 contract["file_path"],
-                contract["content"]
+                contract["content"],
+                contract.get("file_hash"),
+                use_process_pool=True
             )
-            results.append(result)
+            for contract in contracts
+        ])
+        
+        # Check for already-ingested files concurrently
+        unique_hashes = list({result["file_hash"] for result in processed if result["success"]})
+        try:
+            existing = await asyncio.gather(*[self.contract_exists(file_hash) for file_hash in unique_hashes])
+        except Exception as e:
+            return [{
+                "success": False,
+                "file_path": contract["file_path"],
+                "error": f"Failed to ingest contract: {str(e)}"
+            } for contract in contracts]
+        existing_hashes = {file_hash for file_hash, found in zip(unique_hashes, existing) if found}
+        
+        results = []
+        all_documents = []
+        for result in processed:
+            if not result["success"]:
+                results.append(result)
+                continue
+            
+            if result["file_hash"] in existing_hashes:
+                results.append({
+                    "success": True,
+                    "message": "Contract already exists in database",
+                    "file_hash": result["file_hash"],
+                    "action": "skipped"
+                })
+                continue
+            
+            # Identical content later in the same batch is skipped as well
+            existing_hashes.add(result["file_hash"])
+            all_documents.extend(result["documents"])
+            results.append({
+                "success": True,
+                "message": "Contract successfully ingested",
+                "file_path": result["file_path"],
+                "file_hash": result["file_hash"],
+                "chunks_added": result["chunks_count"],
+                "metadata": result["metadata"],
+                "security_patterns": result["security_patterns"],
+                "action": "ingested"
+            })
+        
+        if all_documents:
+            try:
+                await self.upsert_documents(all_documents)
+                self._known_hashes.update(
+                    result["file_hash"] for result in results if result.get("action") == "ingested"
+                )
+            except Exception as e:
+                return [
+                    {
+                        "success": False,
+                        "file_path": result.get("file_path"),
+                        "error": f"Failed to ingest contract: {str(e)}"
+                    } if result.get("action") == "ingested" else result
+                    for result in results
+                ]
         
         return results
     
-    async def search_contracts(self, query: str, k: int = None) -> List[Dict[str, Any]]:
-        """Search for relevant contract chunks"""
-        if not self.vector_store:
+    async def search_contracts(
+        self,
+        query: str,
+        k: int = None,
+        embedding: Optional[List[float]] = None,
+        filter_by_patterns: bool = False
+    ) -> List[Dict[str, Any]]:
+        """Search for relevant contract chunks, reusing a precomputed query embedding if given.
+
+        filter_by_patterns pre-filters on security patterns named in the query; only pass
+        it for a user's own query, not for prompts composed around it.
+        """
+        if not self.index:
             await self.initialize_vector_store()
         
         k = k or self.settings.top_k_results
         
         try:
-            docs = self.vector_store.similarity_search(query, k=k)
+            if embedding is None:
+                embedding = await self.query_embeddings.aembed_query(query)
+            
+            # Restrict the ANN candidate set to chunks tagged with the security
+            # patterns the query refers to; fall back to an unfiltered search
+            matches = []
+            security_patterns = self.parser.identify_query_security_patterns(query) if filter_by_patterns else []
+            if security_patterns:
+                matches = await self._query_index(
+                    embedding,
+                    k,
+                    filter={"security_patterns": {"$in": security_patterns}}
+                )
+            if not matches:
+                matches = await self._query_index(embedding, k)
             
             results = []
-            for doc in docs:
+            for match in matches:
+                metadata = dict(match.metadata or {})
                 results.append({
-                    "content": doc.page_content,
-                    "metadata": doc.metadata,
-                    "relevance_score": getattr(doc, 'score', None)
+                    "content": metadata.pop("text", ""),
+                    "metadata": metadata,
+                    "relevance_score": match.score
                 })
             
             return results
@@ -272,15 +711,30 @@ class ContractIngestionService:
         except Exception as e:
             raise Exception(f"Search failed: {str(e)}")
     
+    async def _query_index(
+        self,
+        embedding: List[float],
+        k: int,
+        filter: Optional[Dict[str, Any]] = None
+    ) -> List[Any]:
+        """Run a nearest-neighbour query against the index off the event loop"""
+        response = await asyncio.to_thread(
+            self.index.query,
+            vector=embedding,
+            top_k=k,
+            include_metadata=True,
+            filter=filter
+        )
+        return response.matches
+    
     async def get_contract_stats(self) -> Dict[str, Any]:
         """Get statistics about ingested contracts"""
-        if not self.vector_store:
+        if not self.index:
             await self.initialize_vector_store()
         
         try:
             # This is a simplified version - in production you'd want more detailed stats
-            index = self.pc.Index(self.settings.pinecone_index_name)
-            stats = index.describe_index_stats()
+            stats = await asyncio.to_thread(self.index.describe_index_stats)
             
             return {
                 "total_vectors": stats.total_vector_count,
@@ -291,5 +745,8 @@ class ContractIngestionService:
         except Exception as e:
             return {"error": f"Failed to get stats: {str(e)}"}
 
-# Global service instance
-ingestion_service = ContractIngestionService()
+# Shared service instance, created on first use rather than at import time
+@lru_cache(maxsize=1)
+def get_ingestion_service() -> ContractIngestionService:
+    """Get the shared ingestion service instance"""
+    return ContractIngestionService()
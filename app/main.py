@@ -4,121 +4,348 @@ FastAPI Main Application
 Smart Contract Audit Bot API Server
 """
 import os
+import asyncio
+import codecs
+import hashlib
+import time
+import uuid
+import queue
+import logging
+import logging.handlers
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import aiofiles
-from typing import List, Dict, Any, Optional
+import orjson
+from typing import Awaitable, Callable, List, Dict, Any, Optional, Tuple
 from datetime import datetime
-from fastapi import FastAPI, File, UploadFile, HTTPException, Depends, BackgroundTasks
+from fastapi import FastAPI, File, UploadFile, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.middleware.gzip import GZipMiddleware
+from starlette.middleware.base import BaseHTTPMiddleware
+from fastapi.responses import ORJSONResponse
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 import uvicorn
 from app.config import get_settings, Settings
-from app.ingestion_sol import ingestion_service
-from app.chatbot_sol import audit_bot
+from app.ingestion_sol import get_ingestion_service
+from app.chatbot_sol import get_audit_bot
 from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
 from fastapi.responses import HTMLResponse
 from fastapi import Request
 
+try:
+    import redis.asyncio as aioredis
+except ImportError:  # Optional; rate limiting falls back to a per-process counter
+    aioredis = None
+
+# Logging: records are queued on the event loop and written by a background
+# thread, so a slow stderr never blocks request handling
+logger = logging.getLogger("app")
+log_queue: queue.SimpleQueue = queue.SimpleQueue()
+log_listener = logging.handlers.QueueListener(log_queue, logging.StreamHandler())
+
+def start_logging() -> None:
+    """Route application logs through the queue and start the writer thread"""
+    if not logger.handlers:
+        logger.addHandler(logging.handlers.QueueHandler(log_queue))
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+    log_listener.start()
+
 # Initialize FastAPI app
 app = FastAPI(
     title="Smart Contract Audit Bot",
     description="AI-powered smart contract security analysis and auditing system",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    default_response_class=ORJSONResponse
+)
+# Mounted under /static: a mount at "/" would shadow every route below it
+app.mount("/static", StaticFiles(directory="app/frontend"), name="static")
+
+# Templates are compiled once and kept; no per-request stat, and compiled
+# bytecode survives restarts (the directory is created on startup)
+JINJA_CACHE_DIR = ".jinja_cache"
+templates = Jinja2Templates(
+    directory="app/frontend",
+    auto_reload=False,
+    cache_size=-1,
+    bytecode_cache=FileSystemBytecodeCache(JINJA_CACHE_DIR)
 )
-app.mount("/", StaticFiles(directory="app/frontend", html=True), name="static")
-
 
 
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000", "http://127.0.0.1:3000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
 
 # Security
 security = HTTPBearer(auto_error=False)
 
-# Pydantic models
+# Pydantic models: immutable, no assignment validation, unknown fields rejected
+MODEL_CONFIG = ConfigDict(extra="forbid", validate_assignment=False, str_strip_whitespace=False, frozen=True)
+
 class ChatRequest(BaseModel):
+    model_config = MODEL_CONFIG
+    
     message: str = Field(..., min_length=1, max_length=2000)
     include_context: bool = True
 
-class ChatResponse(BaseModel):
-    success: bool
-    response: Optional[str] = None
-    context_used: bool = False
-    timestamp: str
-    error: Optional[str] = None
-
 class ContractAnalysisRequest(BaseModel):
+    model_config = MODEL_CONFIG
+    
     contract_content: str = Field(..., min_length=10)
 
 class VulnerabilityExplanationRequest(BaseModel):
+    model_config = MODEL_CONFIG
+    
     vulnerability_type: str = Field(..., min_length=1, max_length=100)
 
-class UploadResponse(BaseModel):
-    success: bool
-    message: str
-    file_hash: Optional[str] = None
-    chunks_added: Optional[int] = None
-    action: Optional[str] = None
-    error: Optional[str] = None
-
-# Dependency injection
-def get_settings_dependency() -> Settings:
-    return get_settings()
-
-# Rate limiting (simplified - in production use Redis)
-request_counts = {}
-
-def check_rate_limit(client_ip: str) -> bool:
-    """Simple rate limiting check"""
-    current_time = datetime.now().timestamp()
-    hour_ago = current_time - 3600
-    
-    if client_ip not in request_counts:
-        request_counts[client_ip] = []
+# Settings never change at runtime, so routes use this instance directly
+SETTINGS: Settings = get_settings()
+
+# Response timestamps only need second resolution: a background task refreshes
+# this string every second and handlers just read it
+CURRENT_ISO = datetime.now().isoformat(timespec="seconds")
+timestamp_task: Optional[asyncio.Task] = None
+
+async def tick_timestamp() -> None:
+    """Keep CURRENT_ISO up to date, waking at each second boundary"""
+    global CURRENT_ISO
+    while True:
+        CURRENT_ISO = datetime.now().isoformat(timespec="seconds")
+        await asyncio.sleep(1 - time.time() % 1)
+
+# Rate limiting: a Redis sorted-set sliding window shared by all workers.
+# The script trims, counts and records in one atomic round-trip.
+RATE_LIMIT_SCRIPT = """
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, tonumber(ARGV[1]) - tonumber(ARGV[3]))
+if redis.call('ZCARD', KEYS[1]) >= tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('ZADD', KEYS[1], ARGV[1], ARGV[4])
+redis.call('PEXPIRE', KEYS[1], ARGV[3])
+return 1
+"""
+
+redis_client = None
+rate_limit_script = None
+
+# Per-process fallback used when Redis is not configured or unreachable:
+# client IP -> GCRA theoretical arrival time, least recently seen first
+request_counts: "OrderedDict[str, float]" = OrderedDict()
+
+async def check_rate_limit(client_ip: str) -> bool:
+    """Record a request for this client and report whether it is within the limit"""
+    if rate_limit_script is not None:
+        # Wall clock, since the window is shared with other processes
+        now_ms = int(time.time() * 1000)
+        try:
+            # EVALSHA, re-sending the script if Redis has flushed its script cache
+            allowed = await rate_limit_script(
+                keys=[f"rl:{client_ip}"],
+                args=[
+                    now_ms,
+                    SETTINGS.rate_limit_requests,
+                    SETTINGS.rate_limit_window * 1000,
+                    f"{now_ms}-{uuid.uuid4().hex}"  # Unique member so same-millisecond requests all count
+                ]
+            )
+            return allowed == 1
+        except aioredis.RedisError:
+            pass
     
-    # Clean old requests
-    request_counts[client_ip] = [
-        req_time for req_time in request_counts[client_ip] 
-        if req_time > hour_ago
-    ]
+    return check_local_rate_limit(client_ip, SETTINGS)
+
+def check_local_rate_limit(client_ip: str, settings: Settings) -> bool:
+    """In-process GCRA rate limiting check"""
+    # Monotonic, so wall-clock adjustments cannot refill or drain budgets
+    current_time = time.monotonic()
+    emission_interval = settings.rate_limit_window / settings.rate_limit_requests
     
-    # Check limit
-    if len(request_counts[client_ip]) >= 100:  # 100 requests per hour
+    # Theoretical arrival time: when the client's budget would next be fully spent.
+    # Up to rate_limit_requests may arrive back to back, then one per interval.
+    arrival_time = max(request_counts.get(client_ip, current_time), current_time)
+    if arrival_time - current_time > settings.rate_limit_window - emission_interval:
         return False
     
-    request_counts[client_ip].append(current_time)
+    request_counts[client_ip] = arrival_time + emission_interval
+    request_counts.move_to_end(client_ip)
+    
+    # Bound memory under scans from many distinct addresses. Evicting a client
+    # whose arrival time has passed loses nothing: it is back to a full budget.
+    if len(request_counts) > settings.rate_limit_max_clients:
+        request_counts.popitem(last=False)
     return True
 
-# Utility functions
-async def validate_file(file: UploadFile, settings: Settings) -> None:
-    """Validate uploaded file"""
-    if file.size > settings.max_file_size:
-        raise HTTPException(
-            status_code=413,
-            detail=f"File too large. Maximum size: {settings.max_file_size / (1024*1024):.1f}MB"
+# Health checks, docs, the frontend page and its assets are not part of the API budget
+RATE_LIMIT_EXEMPT_PATHS = frozenset({
+    "/", "/health", app.docs_url, app.redoc_url, app.openapi_url, app.swagger_ui_oauth2_redirect_url
+})
+
+async def rate_limit_middleware(request: Request, call_next):
+    """Reject clients that exceed the configured request rate"""
+    # Preflights are answered by CORSMiddleware; other OPTIONS requests cost nothing either
+    path = request.url.path
+    if request.method == "OPTIONS" or path in RATE_LIMIT_EXEMPT_PATHS or path.startswith("/static/"):
+        return await call_next(request)
+    
+    client_ip = request.client.host if request.client else "unknown"
+    if not await check_rate_limit(client_ip):
+        return ORJSONResponse(
+            status_code=429,
+            content={
+                "error": "Too many requests",
+                "message": "Rate limit exceeded, please retry later",
+                "timestamp": CURRENT_ISO
+            }
         )
+    return await call_next(request)
+
+# Middleware added later wraps earlier ones: the rate limiter sits inside CORS,
+# so 429 responses still carry CORS headers for the browser
+app.add_middleware(BaseHTTPMiddleware, dispatch=rate_limit_middleware)
+
+# CORS middleware
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=["http://localhost:3000", "http://127.0.0.1:3000"],
+    allow_credentials=True,
+    # Only what the API actually uses; browsers may cache preflights for a day
+    allow_methods=["GET", "POST"],
+    allow_headers=["Authorization", "Content-Type"],
+    max_age=86400,
+)
+
+# Compress larger JSON bodies (analyses, search results); small ones aren't worth the CPU
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
+# Short-lived cache for idempotent routes backed by slow upstream calls:
+# key -> (monotonic expiry, response body), shared through Redis when configured
+response_cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+response_cache_locks: Dict[str, asyncio.Lock] = {}
+
+def get_local_response(key: str) -> Optional[Dict[str, Any]]:
+    entry = response_cache.get(key)
+    if entry is None or entry[0] <= time.monotonic():
+        return None
+    return entry[1]
+
+def set_local_response(key: str, value: Dict[str, Any], ttl: int) -> None:
+    response_cache[key] = (time.monotonic() + ttl, value)
+    response_cache.move_to_end(key)
+    if len(response_cache) > SETTINGS.response_cache_size:
+        response_cache.popitem(last=False)
+
+async def cached_response(
+    key: str,
+    ttl: int,
+    compute: Callable[[], Awaitable[Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """Serve a route result from cache, computing it at most once at a time per key"""
+    value = get_local_response(key)
+    if value is not None:
+        return value
+    
+    # Single flight: concurrent misses wait for one upstream call instead of each making their own
+    lock = response_cache_locks.setdefault(key, asyncio.Lock())
+    async with lock:
+        value = get_local_response(key)
+        if value is not None:
+            return value
+        
+        try:
+            if redis_client is not None:
+                try:
+                    cached = await redis_client.get(f"cache:{key}")
+                    if cached is not None:
+                        value = orjson.loads(cached)
+                except aioredis.RedisError:
+                    pass
+            
+            if value is None:
+                value = await compute()
+                if redis_client is not None:
+                    try:
+                        await redis_client.set(f"cache:{key}", orjson.dumps(value), ex=ttl)
+                    except aioredis.RedisError:
+                        pass
+            
+            set_local_response(key, value, ttl)
+        finally:
+            # Late arrivals find the fresh entry, so the lock is no longer needed
+            response_cache_locks.pop(key, None)
+    
+    return value
+
+class _StatsCache:
+    """Index stats shared by /health and /stats, refreshed by one in-flight task at a time"""
+    task: Optional[asyncio.Task] = None
+    value: Optional[Dict[str, Any]] = None
+    expires: float = 0.0
+
+async def _refresh_stats() -> Dict[str, Any]:
+    try:
+        value = await get_ingestion_service().get_contract_stats()
+        _StatsCache.value = value
+        _StatsCache.expires = time.monotonic() + SETTINGS.stats_cache_ttl
+        return value
+    finally:
+        _StatsCache.task = None
+
+async def cached_stats() -> Dict[str, Any]:
+    """Pinecone index stats, fetched at most once per TTL however many callers ask"""
+    if _StatsCache.value is not None and time.monotonic() < _StatsCache.expires:
+        return _StatsCache.value
     
+    if _StatsCache.task is None:
+        _StatsCache.task = asyncio.create_task(_refresh_stats())
+    # A disconnecting client must not cancel the refresh other callers are waiting on
+    return await asyncio.shield(_StatsCache.task)
+
+# Utility functions
+UPLOAD_READ_SIZE = 64 * 1024
+
+def file_too_large(settings: Settings) -> HTTPException:
+    return HTTPException(
+        status_code=413,
+        detail=f"File too large. Maximum size: {settings.max_file_size / (1024*1024):.1f}MB"
+    )
+
+async def validate_file(file: UploadFile, settings: Settings) -> None:
+    """Validate uploaded file before reading any of its content"""
     file_extension = os.path.splitext(file.filename)[1].lower()
     if file_extension not in settings.allowed_file_extensions:
         raise HTTPException(
             status_code=400,
             detail=f"Invalid file type. Allowed: {', '.join(settings.allowed_file_extensions)}"
         )
+    
+    # The declared size may be missing or wrong; read_upload enforces the real limit
+    if file.size is not None and file.size > settings.max_file_size:
+        raise file_too_large(settings)
+
+async def read_upload(file: UploadFile, settings: Settings) -> Tuple[str, str]:
+    """Stream an upload in fixed-size chunks, returning its UTF-8 text and SHA-256 hash"""
+    decoder = codecs.getincrementaldecoder("utf-8")()
+    hasher = hashlib.sha256()
+    parts = []
+    total_size = 0
+    
+    while chunk := await file.read(UPLOAD_READ_SIZE):
+        total_size += len(chunk)
+        if total_size > settings.max_file_size:
+            raise file_too_large(settings)
+        hasher.update(chunk)
+        parts.append(decoder.decode(chunk))
+    parts.append(decoder.decode(b"", final=True))
+    
+    return "".join(parts), hasher.hexdigest()
 
 # API Routes
 
 @app.get("/", response_class=HTMLResponse)
-async def root(request: Request):  # ❗ You missed the `request` parameter
+async def root(request: Request):
+    """Serve the web UI"""
     return templates.TemplateResponse("index.html", {"request": request})
 
 
@@ -128,108 +355,108 @@ async def health_check():
     """Health check endpoint"""
     try:
         # Test database connection
-        stats = await ingestion_service.get_contract_stats()
+        stats = await cached_stats()
         
-        return {
+        return ORJSONResponse({
             "status": "healthy",
-            "timestamp": datetime.now().isoformat(),
+            "timestamp": CURRENT_ISO,
             "database": "connected" if "error" not in stats else "error",
             "services": {
                 "ingestion": "active",
                 "chatbot": "active",
                 "vector_db": "connected" if "error" not in stats else "error"
             }
-        }
+        })
     except Exception as e:
-        return JSONResponse(
+        return ORJSONResponse(
             status_code=503,
             content={
                 "status": "unhealthy",
                 "error": str(e),
-                "timestamp": datetime.now().isoformat()
+                "timestamp": CURRENT_ISO
             }
         )
 
-@app.post("/upload", response_model=UploadResponse)
+@app.post("/upload")
 async def upload_contract(
-    file: UploadFile = File(...),
-    background_tasks: BackgroundTasks = BackgroundTasks(),
-    settings: Settings = Depends(get_settings_dependency)
+    file: UploadFile = File(...)
 ):
     """Upload and ingest a smart contract file"""
     try:
         # Validate file
-        await validate_file(file, settings)
+        await validate_file(file, SETTINGS)
         
         # Read file content
-        content = await file.read()
-        content_str = content.decode('utf-8')
+        content_str, file_hash = await read_upload(file, SETTINGS)
         
         # Ingest contract
-        result = await ingestion_service.ingest_contract(file.filename, content_str)
+        result = await get_ingestion_service().ingest_contract(file.filename, content_str, file_hash)
         
         if result["success"]:
-            return UploadResponse(
-                success=True,
-                message=result["message"],
-                file_hash=result.get("file_hash"),
-                chunks_added=result.get("chunks_added"),
-                action=result.get("action")
-            )
+            return ORJSONResponse({
+                "success": True,
+                "message": result["message"],
+                "file_hash": result.get("file_hash"),
+                "chunks_added": result.get("chunks_added"),
+                "action": result.get("action"),
+                "error": None
+            })
         else:
             raise HTTPException(status_code=400, detail=result["error"])
             
+    except HTTPException:
+        raise
     except UnicodeDecodeError:
         raise HTTPException(status_code=400, detail="File must be valid UTF-8 text")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
-@app.post("/chat", response_model=ChatResponse)
+@app.post("/chat")
 async def chat_with_bot(
-    request: ChatRequest,
-    settings: Settings = Depends(get_settings_dependency)
+    request: ChatRequest
 ):
     """Chat with the audit bot"""
     try:
-        result = await audit_bot.chat(
+        result = await get_audit_bot().chat(
             user_message=request.message,
             include_context=request.include_context
         )
         
         if result["success"]:
-            return ChatResponse(
-                success=True,
-                response=result["response"],
-                context_used=result["context_used"],
-                timestamp=result["timestamp"]
-            )
+            return ORJSONResponse({
+                "success": True,
+                "response": result["response"],
+                "context_used": result["context_used"],
+                "timestamp": result["timestamp"],
+                "error": None
+            })
         else:
-            return ChatResponse(
-                success=False,
-                error=result["error"],
-                context_used=False,
-                timestamp=datetime.now().isoformat()
-            )
+            return ORJSONResponse({
+                "success": False,
+                "response": None,
+                "context_used": False,
+                "timestamp": CURRENT_ISO,
+                "error": result["error"]
+            })
             
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Chat failed: {str(e)}")
 
 @app.post("/analyze")
 async def analyze_contract(
-    request: ContractAnalysisRequest,
-    settings: Settings = Depends(get_settings_dependency)
+    request: ContractAnalysisRequest
 ):
     """Perform comprehensive security analysis of a contract"""
     try:
-        result = await audit_bot.analyze_contract_security(request.contract_content)
+        result = await get_audit_bot().analyze_contract_security(request.contract_content)
         
         if result["success"]:
-            return {
+            return ORJSONResponse({
                 "success": True,
                 "analysis": result["analysis"],
                 "timestamp": result["timestamp"],
                 "contract_hash": result["contract_hash"]
-            }
+            })
         else:
             raise HTTPException(status_code=400, detail=result["error"])
             
@@ -238,19 +465,18 @@ async def analyze_contract(
 
 @app.post("/improvements")
 async def suggest_improvements(
-    request: ContractAnalysisRequest,
-    settings: Settings = Depends(get_settings_dependency)
+    request: ContractAnalysisRequest
 ):
     """Suggest improvements for a contract"""
     try:
-        result = await audit_bot.suggest_improvements(request.contract_content)
+        result = await get_audit_bot().suggest_improvements(request.contract_content)
         
         if result["success"]:
-            return {
+            return ORJSONResponse({
                 "success": True,
                 "improvements": result["improvements"],
                 "timestamp": result["timestamp"]
-            }
+            })
         else:
             raise HTTPException(status_code=400, detail=result["error"])
             
@@ -259,20 +485,19 @@ async def suggest_improvements(
 
 @app.post("/explain-vulnerability")
 async def explain_vulnerability(
-    request: VulnerabilityExplanationRequest,
-    settings: Settings = Depends(get_settings_dependency)
+    request: VulnerabilityExplanationRequest
 ):
     """Explain a specific vulnerability type"""
     try:
-        result = await audit_bot.explain_vulnerability(request.vulnerability_type)
+        result = await get_audit_bot().explain_vulnerability(request.vulnerability_type)
         
         if result["success"]:
-            return {
+            return ORJSONResponse({
                 "success": True,
                 "explanation": result["explanation"],
                 "vulnerability_type": result["vulnerability_type"],
                 "timestamp": result["timestamp"]
-            }
+            })
         else:
             raise HTTPException(status_code=400, detail=result["error"])
             
@@ -283,14 +508,14 @@ async def explain_vulnerability(
 async def get_system_stats():
     """Get system statistics"""
     try:
-        db_stats = await ingestion_service.get_contract_stats()
-        conversation_stats = audit_bot.get_conversation_summary()
+        db_stats = await cached_stats()
+        conversation_stats = get_audit_bot().get_conversation_summary()
         
-        return {
+        return ORJSONResponse({
             "database": db_stats,
             "conversation": conversation_stats,
-            "timestamp": datetime.now().isoformat()
-        }
+            "timestamp": CURRENT_ISO
+        })
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Stats retrieval failed: {str(e)}")
@@ -299,12 +524,12 @@ async def get_system_stats():
 async def clear_conversation():
     """Clear the current conversation history"""
     try:
-        audit_bot.clear_conversation()
-        return {
+        get_audit_bot().clear_conversation()
+        return ORJSONResponse({
             "success": True,
             "message": "Conversation history cleared",
-            "timestamp": datetime.now().isoformat()
-        }
+            "timestamp": CURRENT_ISO
+        })
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Clear conversation failed: {str(e)}")
 
@@ -318,39 +543,46 @@ async def search_contracts(
         if not query.strip():
             raise HTTPException(status_code=400, detail="Query cannot be empty")
         
-        results = await ingestion_service.search_contracts(query, k)
+        async def run_search() -> Dict[str, Any]:
+            results = await get_ingestion_service().search_contracts(query, k, filter_by_patterns=True)
+            
+            return {
+                "success": True,
+                "query": query,
+                "results": results,
+                "count": len(results),
+                "timestamp": CURRENT_ISO
+            }
         
-        return {
-            "success": True,
-            "query": query,
-            "results": results,
-            "count": len(results),
-            "timestamp": datetime.now().isoformat()
-        }
+        # Identical queries within the TTL skip embedding and the Pinecone round-trip
+        key = "search:" + hashlib.sha256(f"{k}:{query}".encode("utf-8")).hexdigest()
+        return ORJSONResponse(await cached_response(key, SETTINGS.search_cache_ttl, run_search))
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Search failed: {str(e)}")
 
 # Error handlers
 @app.exception_handler(404)
 async def not_found_handler(request, exc):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=404,
         content={
             "error": "Endpoint not found",
             "message": "The requested endpoint does not exist",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": CURRENT_ISO
         }
     )
 
 @app.exception_handler(500)
 async def internal_error_handler(request, exc):
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=500,
         content={
             "error": "Internal server error",
             "message": "An unexpected error occurred",
-            "timestamp": datetime.now().isoformat()
+            "timestamp": CURRENT_ISO
         }
     )
 
@@ -358,21 +590,64 @@ async def internal_error_handler(request, exc):
 @app.on_event("startup")
 async def startup_event():
     """Initialize services on startup"""
+    global redis_client, rate_limit_script, timestamp_task
+    start_logging()
+    os.makedirs(JINJA_CACHE_DIR, exist_ok=True)
+    timestamp_task = asyncio.create_task(tick_timestamp())
+    
+    # Bounded pool behind asyncio.to_thread: Pinecone calls, hashing and tokenization
+    asyncio.get_running_loop().set_default_executor(
+        ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4), thread_name_prefix="app-worker")
+    )
     try:
-        await ingestion_service.initialize_vector_store()
-        print("✅ Smart Contract Audit Bot API started successfully")
-        print("📚 Vector database initialized")
-        print("🤖 Chatbot ready")
-        print("🔍 Ingestion service active")
+        if SETTINGS.redis_url and aioredis is None:
+            logger.warning("REDIS_URL is set but the redis package is not installed; rate limits are per-process")
+        elif SETTINGS.redis_url:
+            # Short timeouts, so an unreachable Redis falls back quickly instead of stalling requests
+            redis_client = aioredis.from_url(
+                SETTINGS.redis_url,
+                socket_connect_timeout=SETTINGS.redis_timeout,
+                socket_timeout=SETTINGS.redis_timeout
+            )
+            rate_limit_script = redis_client.register_script(RATE_LIMIT_SCRIPT)
+        
+        await get_ingestion_service().initialize_vector_store()
+        logger.info("Smart Contract Audit Bot API started successfully")
+        logger.info("Vector database initialized")
+        logger.info("Chatbot ready")
+        logger.info("Ingestion service active")
     except Exception as e:
-        print(f"❌ Startup failed: {str(e)}")
+        logger.error(f"Startup failed: {str(e)}")
+        # Shutdown never runs after a failed startup; flush the queue before exiting
+        log_listener.stop()
         raise
 
+# Shutdown event
+@app.on_event("shutdown")
+async def shutdown_event():
+    """Persist in-process caches and release worker processes on shutdown"""
+    # Only touch services that were actually created
+    if get_audit_bot.cache_info().currsize:
+        get_audit_bot().semantic_cache.save()
+    if get_ingestion_service.cache_info().currsize:
+        get_ingestion_service().shutdown()
+    if redis_client is not None:
+        await redis_client.aclose()
+    if timestamp_task is not None:
+        timestamp_task.cancel()
+    log_listener.stop()
+
 if __name__ == "__main__":
     uvicorn.run(
         "app.main:app",
         host="127.0.0.1",  # Changed from 0.0.0.0
         port=8001,
-        reload=True,
+        # uvloop and httptools (installed with uvicorn[standard]) where the platform supports them
+        loop="auto",
+        http="auto",
+        # Conversation history, the semantic cache and the parsing pool live in each
+        # process, so more than one worker is opt-in (see README)
+        workers=int(os.getenv("WORKERS", 1)),
+        reload=False,
         log_level="info"
     )
@@ -0,0 +1,247 @@
+"""
+Semantic Cache Module
+Caches retrieved RAG context keyed by query embedding similarity
+"""
+import json
+import os
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+try:
+    import faiss
+except ImportError:  # Optional accelerator; fall back to a brute-force scan
+    faiss = None
+
+# Below this capacity an exact inner-product scan is faster than graph traversal
+HNSW_MIN_CAPACITY = 100_000
+
+# Rows dequantized at a time when scanning an int8 cache, bounding the float32 temporary
+QUANTIZED_BLOCK_ROWS = 1024
+
+# Embeddings, contexts and the ANN index are persisted together in this file
+CACHE_FILE = "cache.npz"
+
+
+class SemanticCache:
+    """LRU cache of query embeddings -> context strings matched by cosine similarity"""
+
+    def __init__(
+        self,
+        dimension: int,
+        capacity: int = 1024,
+        threshold: float = 0.95,
+        path: Optional[str] = None,
+        quantize: bool = False
+    ):
+        self.dimension = dimension
+        self.capacity = capacity
+        self.threshold = threshold
+        self.path = path
+        self.quantize = quantize
+
+        # Preallocated embedding matrix; only the first `size` rows are live.
+        # Quantized caches store int8 codes plus a per-row scale (4x less memory).
+        self.embeddings = np.zeros((capacity, dimension), dtype=np.int8 if quantize else np.float32)
+        self.scales = np.ones(capacity, dtype=np.float32)
+        self.contexts: List[Optional[str]] = [None] * capacity
+        self.last_used = np.zeros(capacity, dtype=np.int64)
+        self.size = 0
+        self._clock = 0
+
+        self.index = self._create_index()
+        self._stale = 0
+
+        if path:
+            self._load()
+
+    def __len__(self) -> int:
+        return self.size
+
+    @property
+    def _uses_hnsw(self) -> bool:
+        return self.capacity >= HNSW_MIN_CAPACITY
+
+    def _create_index(self):
+        """Create an ANN index over the cached embeddings, if FAISS is installed"""
+        # FAISS 8-bit quantizers need representative training data up front,
+        # so quantized caches always use the int8 brute-force scan
+        if faiss is None or self.quantize:
+            return None
+
+        if self._uses_hnsw:
+            base = faiss.IndexHNSWFlat(self.dimension, 32, faiss.METRIC_INNER_PRODUCT)
+            base.hnsw.efConstruction = 200
+            base.hnsw.efSearch = 64
+        else:
+            base = faiss.IndexFlatIP(self.dimension)
+
+        # Vector ids are slot numbers in the embedding matrix
+        return faiss.IndexIDMap2(base)
+
+    def _rebuild_index(self) -> None:
+        self.index = self._create_index()
+        self._stale = 0
+        if self.index is not None and self.size:
+            self.index.add_with_ids(self.embeddings[:self.size], np.arange(self.size, dtype=np.int64))
+
+    @staticmethod
+    def normalize(embedding: Sequence[float]) -> np.ndarray:
+        """Convert an embedding to a unit-length float32 vector"""
+        vector = np.asarray(embedding, dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm > 0 else vector
+
+    @staticmethod
+    def quantize_vector(vector: np.ndarray):
+        """Symmetric int8 quantization scaled by the vector's max magnitude"""
+        max_abs = float(np.abs(vector).max())
+        scale = max_abs / 127 if max_abs > 0 else 1.0
+        codes = np.round(vector / scale).astype(np.int8)
+        return codes, np.float32(scale)
+
+    def _store(self, slot: int, embedding: np.ndarray) -> None:
+        if self.quantize:
+            self.embeddings[slot], self.scales[slot] = self.quantize_vector(embedding)
+        else:
+            self.embeddings[slot] = embedding
+
+    def _touch(self, slot: int) -> None:
+        self._clock += 1
+        self.last_used[slot] = self._clock
+
+    def _quantized_similarities(self, embedding: np.ndarray) -> np.ndarray:
+        """Cosine similarities against the int8 rows, dequantizing one block at a time"""
+        codes, scale = self.quantize_vector(embedding)
+        query = codes.astype(np.float32)
+        similarities = np.empty(self.size, dtype=np.float32)
+        for start in range(0, self.size, QUANTIZED_BLOCK_ROWS):
+            end = min(start + QUANTIZED_BLOCK_ROWS, self.size)
+            similarities[start:end] = self.embeddings[start:end].astype(np.float32) @ query
+        similarities *= self.scales[:self.size] * scale
+        return similarities
+
+    def _search(self, embedding: np.ndarray) -> Optional[int]:
+        """Return the slot of the most similar live entry above the threshold"""
+        if self.index is None:
+            # Single GEMV over the live rows; embeddings are unit length so this is cosine
+            if self.quantize:
+                similarities = self._quantized_similarities(embedding)
+            else:
+                similarities = self.embeddings[:self.size] @ embedding
+            best = int(np.argmax(similarities))
+            return best if similarities[best] >= self.threshold else None
+
+        # HNSW cannot remove vectors, so evicted entries may linger in the graph;
+        # over-fetch and verify each candidate against the live embedding row
+        k = min(self.index.ntotal, 1 + self._stale, 8)
+        scores, slots = self.index.search(embedding[None, :], k)
+        for score, slot in zip(scores[0], slots[0]):
+            if slot < 0 or score < self.threshold:
+                break
+            if float(self.embeddings[slot] @ embedding) >= self.threshold:
+                return int(slot)
+        return None
+
+    def lookup(self, embedding: np.ndarray) -> Optional[str]:
+        """Return cached context for the most similar query above the threshold"""
+        if self.size == 0:
+            return None
+
+        slot = self._search(embedding)
+        if slot is None:
+            return None
+
+        self._touch(slot)
+        return self.contexts[slot]
+
+    def add(self, embedding: np.ndarray, context: str) -> None:
+        """Insert a query embedding and its context, evicting the least recently used entry"""
+        if self.size < self.capacity:
+            slot = self.size
+            self.size += 1
+        else:
+            slot = int(np.argmin(self.last_used))
+            if self.index is not None:
+                if self._uses_hnsw:
+                    self._stale += 1
+                else:
+                    self.index.remove_ids(np.array([slot], dtype=np.int64))
+
+        self._store(slot, embedding)
+        self.contexts[slot] = context
+        self._touch(slot)
+
+        if self.index is not None:
+            if self._stale >= self.capacity:
+                self._rebuild_index()
+            else:
+                self.index.add_with_ids(embedding[None, :], np.array([slot], dtype=np.int64))
+
+    def clear(self) -> None:
+        """Drop all cached entries"""
+        self.contexts = [None] * self.capacity
+        self.last_used[:] = 0
+        self.size = 0
+        self.index = self._create_index()
+        self._stale = 0
+
+    def save(self) -> None:
+        """Persist the cache so it survives restarts.
+
+        Everything goes into one file, written under a per-process temporary name and
+        renamed into place, so concurrent writers never leave a mix of two snapshots.
+        """
+        if not self.path:
+            return
+
+        os.makedirs(self.path, exist_ok=True)
+        arrays = {
+            "embeddings": self.embeddings[:self.size],
+            "scales": self.scales[:self.size],
+            "last_used": self.last_used[:self.size],
+            "contexts": np.frombuffer(json.dumps(self.contexts[:self.size]).encode("utf-8"), dtype=np.uint8)
+        }
+        if self.index is not None:
+            arrays["index"] = faiss.serialize_index(self.index)
+
+        final_path = os.path.join(self.path, CACHE_FILE)
+        temp_path = f"{final_path}.{os.getpid()}.tmp"
+        with open(temp_path, "wb") as f:
+            np.savez(f, **arrays)
+        os.replace(temp_path, final_path)
+
+    def _load(self) -> None:
+        """Restore a previously saved cache, ignoring it if incompatible"""
+        cache_path = os.path.join(self.path, CACHE_FILE)
+        if not os.path.exists(cache_path):
+            return
+
+        try:
+            with np.load(cache_path) as arrays:
+                embeddings = arrays["embeddings"]
+                scales = arrays["scales"]
+                last_used = arrays["last_used"]
+                contexts = json.loads(arrays["contexts"].tobytes().decode("utf-8"))
+                index_bytes = arrays["index"] if "index" in arrays.files else None
+        except (OSError, ValueError, KeyError):
+            return
+
+        size = len(contexts)
+        if (embeddings.shape != (size, self.dimension) or size > self.capacity
+                or embeddings.dtype != self.embeddings.dtype):
+            return
+
+        self.embeddings[:size] = embeddings
+        self.scales[:size] = scales
+        self.last_used[:size] = last_used
+        self.contexts[:size] = contexts
+        self.size = size
+        self._clock = int(last_used.max()) if size else 0
+
+        if self.index is not None and index_bytes is not None:
+            index = faiss.deserialize_index(index_bytes)
+            if index.d == self.dimension and index.ntotal == size:
+                self.index = index
+                return
+        self._rebuild_index()
@@ -3,25 +3,29 @@
 Clear Python cache files
 """
 import os
+import sys
 import shutil
 
-def clear_pycache(directory="."):
+def clear_pycache(directory=".", verbose=False):
     """Remove all __pycache__ directories and .pyc files"""
-    for root, dirs, files in os.walk(directory):
-        # Remove __pycache__ directories
-        if "__pycache__" in dirs:
-            pycache_path = os.path.join(root, "__pycache__")
-            print(f"Removing: {pycache_path}")
-            shutil.rmtree(pycache_path)
-            dirs.remove("__pycache__")
-        
-        # Remove .pyc files
-        for file in files:
-            if file.endswith(".pyc"):
-                pyc_path = os.path.join(root, file)
-                print(f"Removing: {pyc_path}")
-                os.remove(pyc_path)
+    # Iterative scandir walk: DirEntry carries its path and type from readdir,
+    # so there is no per-entry stat or path join
+    stack = [directory]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name == "__pycache__":
+                        if verbose:
+                            print(f"Removing: {entry.path}")
+                        shutil.rmtree(entry.path)
+                    else:
+                        stack.append(entry.path)
+                elif entry.name.endswith(".pyc"):
+                    if verbose:
+                        print(f"Removing: {entry.path}")
+                    os.unlink(entry.path)
 
 if __name__ == "__main__":
-    clear_pycache()
+    clear_pycache(verbose="-v" in sys.argv[1:])
     print("Cache cleared!")
\ No newline at end of file
@@ -8,6 +8,20 @@ import os
 # Add the current directory to Python path
 sys.path.insert(0, os.getcwd())
 
+# Variables reported by this check
+KEYS = (
+    "OPENAI_API_KEY",
+    "PINECONE_API_KEY",
+    "PINECONE_INDEX_NAME",
+    "PINECONE_ENVIRONMENT",
+    "PINECONE_REGION",
+    "INDEX_DIMENSION",
+    "INDEX_METRIC",
+    "TOP_K",
+    "MIN_SCORE",
+    "DEBUG_MODE"
+)
+
 try:
     print("Testing configuration loading...")
     
@@ -16,21 +30,10 @@ try:
     load_dotenv()
     
     print("Environment variables loaded:")
-    env_vars = [
-        "OPENAI_API_KEY",
-        "PINECONE_API_KEY", 
-        "PINECONE_INDEX_NAME",
-        "PINECONE_ENVIRONMENT",
-        "PINECONE_REGION",
-        "INDEX_DIMENSION",
-        "INDEX_METRIC",
-        "TOP_K",
-        "MIN_SCORE",
-        "DEBUG_MODE"
-    ]
+    env_snapshot = dict(os.environ)
     
-    for var in env_vars:
-        value = os.getenv(var)
+    for var in KEYS:
+        value = env_snapshot.get(var)
         if value:
             # Hide sensitive keys
             if "KEY" in var:
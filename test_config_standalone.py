@@ -6,22 +6,26 @@ import os
 import sys
 from dotenv import load_dotenv
 
+# Variables reported by this check
+KEYS = (
+    "OPENAI_API_KEY",
+    "PINECONE_API_KEY",
+    "PINECONE_INDEX_NAME",
+    "PINECONE_ENVIRONMENT",
+    "PINECONE_REGION",
+    "INDEX_DIMENSION",
+    "INDEX_METRIC",
+    "TOP_K",
+    "MIN_SCORE",
+    "DEBUG_MODE"
+)
+
 # Load environment variables
 load_dotenv()
 
 print("=== Environment Variables Test ===")
-env_vars = {
-    "OPENAI_API_KEY": os.getenv("OPENAI_API_KEY"),
-    "PINECONE_API_KEY": os.getenv("PINECONE_API_KEY"),
-    "PINECONE_INDEX_NAME": os.getenv("PINECONE_INDEX_NAME"),
-    "PINECONE_ENVIRONMENT": os.getenv("PINECONE_ENVIRONMENT"),
-    "PINECONE_REGION": os.getenv("PINECONE_REGION"),
-    "INDEX_DIMENSION": os.getenv("INDEX_DIMENSION"),
-    "INDEX_METRIC": os.getenv("INDEX_METRIC"),
-    "TOP_K": os.getenv("TOP_K"),
-    "MIN_SCORE": os.getenv("MIN_SCORE"),
-    "DEBUG_MODE": os.getenv("DEBUG_MODE")
-}
+env_snapshot = dict(os.environ)
+env_vars = {key: env_snapshot.get(key) for key in KEYS}
 
 for key, value in env_vars.items():
     if value:
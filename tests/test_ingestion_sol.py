@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Test suite for the Solidity ingestion helpers
+Validates chunking, embedding caching and query pattern detection without external services
+"""
+
+import sys
+import os
+from concurrent.futures import ThreadPoolExecutor
+from typing import List
+
+from langchain_core.embeddings import Embeddings
+
+# Add parent directory to path to import the app package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.ingestion_sol import SolidityParser, create_cached_embeddings, fast_chunk, process_contract
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic embedder that records how many texts it was asked to embed"""
+
+    model = "text-embedding-ada-002"
+
+    def __init__(self):
+        self.calls = 0
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        self.calls += len(texts)
+        return [[float(len(text)), 1.0] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self.embed_documents([text])[0]
+
+
+class TestFastChunk:
+    """Test suite for the offset-based text chunker"""
+
+    def test_chunks_respect_size_and_cover_text(self):
+        """No chunk exceeds the size limit and every character lands in a chunk"""
+        text = "".join(str(i % 10) for i in range(95))
+        chunks = list(fast_chunk(text, size=20, overlap=5))
+
+        assert all(len(chunk) <= 20 for chunk in chunks)
+        assert chunks[0] == text[:20]
+        assert chunks[-1].endswith(text[-5:])
+
+        print("✓ Chunks stay within the size bound")
+
+    def test_consecutive_chunks_overlap(self):
+        """Each chunk starts with the last `overlap` characters of the previous one"""
+        text = "".join(chr(ord("a") + i % 26) for i in range(100))
+        chunks = list(fast_chunk(text, size=20, overlap=5))
+
+        for previous, current in zip(chunks, chunks[1:]):
+            assert current[:5] == previous[-5:]
+        assert "".join([chunks[0]] + [chunk[5:] for chunk in chunks[1:]]) == text
+
+        print("✓ Consecutive chunks overlap by the configured amount")
+
+    def test_chunks_snap_to_separators(self):
+        """Chunks end after a separator in the back half of the window, preferring paragraph breaks"""
+        text = "word " * 3 + "tail\n\nnext paragraph " + "x" * 30
+        chunks = list(fast_chunk(text, size=30, overlap=0))
+
+        assert chunks[0] == "word word word tail\n\n"
+        assert chunks[1].startswith("next paragraph ")
+
+        # A separator in the front half of the window would leave a tiny chunk, so it is ignored
+        early = list(fast_chunk("ab " + "c" * 40, size=20, overlap=0))
+        assert early[0] == ("ab " + "c" * 40)[:20]
+
+        print("✓ Chunks snap to separators")
+
+    def test_overlap_not_smaller_than_size_still_advances(self):
+        """An overlap covering the whole chunk advances one character at a time instead of looping"""
+        assert list(fast_chunk("abcdefgh", size=4, overlap=4)) == ["abcd", "bcde", "cdef", "defg", "efgh"]
+        assert list(fast_chunk("abcdef", size=3, overlap=10)) == ["abc", "bcd", "cde", "def"]
+
+        print("✓ Large overlaps terminate")
+
+    def test_whitespace_only_input_yields_nothing(self):
+        """Empty and whitespace-only text produce no chunks"""
+        assert list(fast_chunk("", size=10, overlap=2)) == []
+        assert list(fast_chunk(" \n\n \t " * 10, size=10, overlap=2)) == []
+
+        print("✓ Whitespace-only input is skipped")
+
+
+class TestCachedEmbeddings:
+    """Test suite for the disk-backed embedding cache"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.fake = FakeEmbeddings()
+
+    def test_embed_documents_round_trip(self, tmp_path):
+        """Embeddings are written to and served from the local file store"""
+        embeddings = create_cached_embeddings(self.fake, str(tmp_path), "openai")
+
+        first = embeddings.embed_documents(["contract A {}", "contract B {}"])
+        second = embeddings.embed_documents(["contract A {}", "contract B {}"])
+
+        assert first == second == [[13.0, 1.0], [13.0, 1.0]]
+        assert self.fake.calls == 2, "Cached chunks should not be embedded again"
+        assert any(tmp_path.iterdir()), "Embeddings should be persisted on disk"
+
+        print("✓ Embeddings round-trip through the disk cache")
+
+    def test_namespace_uses_store_safe_characters(self, tmp_path):
+        """Model names with characters LocalFileStore rejects still work"""
+        self.fake.model = "org/model:v1"
+        embeddings = create_cached_embeddings(self.fake, str(tmp_path), "huggingface")
+
+        assert embeddings.embed_documents(["pragma solidity ^0.8.0;"]) == [[23.0, 1.0]]
+        assert self.fake.calls == 1
+
+        print("✓ Cache namespace only contains allowed key characters")
+
+
+class TestQuerySecurityPatterns:
+    """Test suite for the security-pattern pre-filter derived from user queries"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.parser = SolidityParser()
+
+    def test_prose_does_not_add_tags(self):
+        """Vulnerability names and prose never map onto mitigation tags"""
+        assert self.parser.identify_query_security_patterns("what is happening now with reentrancy") == []
+        assert self.parser.identify_query_security_patterns("is this vulnerable to overflow or access control bugs?") == []
+
+        print("✓ Prose queries are not pre-filtered")
+
+    def test_named_constructs_add_tags(self):
+        """Code keywords and construct names select the matching tags"""
+        assert self.parser.identify_query_security_patterns("contracts using block.timestamp") == ["time_dependency"]
+        assert self.parser.identify_query_security_patterns("is delegatecall safe here") == ["external_calls"]
+        assert self.parser.identify_query_security_patterns("how does nonReentrant work") == ["reentrancy_guard"]
+
+        print("✓ Named constructs select security pattern tags")
+
+
+class TestConcurrentParsing:
+    """Test suite for parsing contracts from several threads at once"""
+
+    def test_concurrent_threads_share_one_parser(self):
+        """Threads scanning through the shared parser all succeed with identical results"""
+        content = (
+            "pragma solidity ^0.8.0;\n"
+            "contract A { function f() external { msg.sender.call(\"\"); require(block.timestamp > 0); } }\n"
+        ) * 5000
+
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            results = list(executor.map(lambda _: process_contract("A.sol", content, 1000, 200), range(16)))
+
+        assert all(result["success"] for result in results), [result.get("error") for result in results]
+        assert len({tuple(result["security_patterns"]) for result in results}) == 1
+        assert "time_dependency" in results[0]["security_patterns"]
+
+        print("✓ Concurrent parsing through a shared parser works")
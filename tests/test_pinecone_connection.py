@@ -17,6 +17,11 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import Config
 
+# Deterministic float32 vectors, generated once: two documents and a query.
+# Converted to lists only at the Pinecone boundary.
+RNG = np.random.default_rng(0)
+TEST_VECTORS = RNG.random((3, 1536), dtype=np.float32)
+
 class TestPineconeConnection:
     """Test suite for Pinecone connection and basic operations"""
     
@@ -24,13 +29,14 @@ class TestPineconeConnection:
         """Setup for each test method"""
         self.config = None
         self.index = None
+        self.inserted_ids = []
     
     def teardown_method(self):
         """Cleanup after each test method"""
-        if self.index and hasattr(self.index, 'delete'):
+        if self.index and self.inserted_ids:
             try:
-                # Clean up test vectors
-                self.index.delete(delete_all=True)
+                # Clean up only the vectors this test wrote; the index may be shared
+                self.index.delete(ids=self.inserted_ids)
             except:
                 pass
     
@@ -116,7 +122,7 @@ class TestPineconeConnection:
             test_vectors = [
                 {
                     'id': 'test-doc-1',
-                    'values': np.random.rand(1536).tolist(),
+                    'values': TEST_VECTORS[0].tolist(),
                     'metadata': {
                         'content': 'This is a test smart contract audit document',
                         'type': 'audit',
@@ -125,7 +131,7 @@ class TestPineconeConnection:
                 },
                 {
                     'id': 'test-doc-2', 
-                    'values': np.random.rand(1536).tolist(),
+                    'values': TEST_VECTORS[1].tolist(),
                     'metadata': {
                         'content': 'Another test document about security vulnerabilities',
                         'type': 'vulnerability',
@@ -135,6 +141,7 @@ class TestPineconeConnection:
             ]
             
             # Upsert test vectors
+            self.inserted_ids.extend(vector['id'] for vector in test_vectors)
             upsert_response = self.index.upsert(vectors=test_vectors)
             assert upsert_response['upserted_count'] == 2, "Failed to upsert test vectors"
             
@@ -144,7 +151,7 @@ class TestPineconeConnection:
             time.sleep(2)
             
             # Test query
-            query_vector = np.random.rand(1536).tolist()
+            query_vector = TEST_VECTORS[2].tolist()
             query_response = self.index.query(
                 vector=query_vector,
                 top_k=2,
@@ -165,7 +172,8 @@ class TestPineconeConnection:
             print("✓ Fetch executed successfully")
             
             # Cleanup
-            self.index.delete(ids=['test-doc-1', 'test-doc-2'])
+            self.index.delete(ids=self.inserted_ids)
+            self.inserted_ids = []
             print("✓ Test vectors cleaned up")
             
         except Exception as e:
@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Test suite for the in-process rate limiter
+Validates GCRA burst and refill behaviour with a controlled clock, and which paths are limited
+"""
+
+import sys
+import os
+from types import SimpleNamespace
+
+from fastapi.testclient import TestClient
+
+# Add parent directory to path to import the app package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Settings require API keys; no external service is contacted by these tests.
+# A blank .env entry may already have been loaded, so empty values are replaced too.
+for key in ("OPENAI_API_KEY", "PINECONE_API_KEY"):
+    os.environ[key] = os.environ.get(key) or f"test-{key.lower()}"
+
+import app.main as main
+from app.main import check_local_rate_limit, request_counts
+
+
+class TestLocalRateLimit:
+    """Test suite for check_local_rate_limit"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        # 5 requests per 10 seconds: one request every 2 seconds once the burst is spent
+        self.settings = SimpleNamespace(rate_limit_requests=5, rate_limit_window=10, rate_limit_max_clients=100)
+        self.now = 1000.0
+        request_counts.clear()
+
+    def teardown_method(self):
+        """Cleanup after each test method"""
+        request_counts.clear()
+
+    def _patch_clock(self, monkeypatch):
+        monkeypatch.setattr(main.time, "monotonic", lambda: self.now)
+
+    def test_full_burst_then_reject(self, monkeypatch):
+        """Exactly rate_limit_requests back-to-back requests pass and the next is rejected"""
+        self._patch_clock(monkeypatch)
+
+        results = [check_local_rate_limit("10.0.0.1", self.settings) for _ in range(6)]
+
+        assert results == [True] * 5 + [False]
+        assert check_local_rate_limit("10.0.0.2", self.settings), "Other clients keep their own budget"
+
+        print("✓ Burst of rate_limit_requests admitted, next request rejected")
+
+    def test_one_request_readmitted_per_emission_interval(self, monkeypatch):
+        """After the burst, one request is admitted each time an emission interval elapses"""
+        self._patch_clock(monkeypatch)
+        for _ in range(5):
+            assert check_local_rate_limit("10.0.0.1", self.settings)
+
+        for _ in range(3):
+            self.now += 1.0
+            assert not check_local_rate_limit("10.0.0.1", self.settings), "Half an interval is not enough"
+            self.now += 1.0
+            assert check_local_rate_limit("10.0.0.1", self.settings)
+            assert not check_local_rate_limit("10.0.0.1", self.settings), "Only one request per interval"
+
+        print("✓ One request readmitted per emission interval")
+
+    def test_idle_client_regains_full_burst(self, monkeypatch):
+        """A client idle for a whole window may burst again"""
+        self._patch_clock(monkeypatch)
+        for _ in range(5):
+            assert check_local_rate_limit("10.0.0.1", self.settings)
+
+        self.now += 10.0
+        results = [check_local_rate_limit("10.0.0.1", self.settings) for _ in range(6)]
+
+        assert results == [True] * 5 + [False]
+
+        print("✓ Full budget restored after a quiet window")
+
+    def test_least_recently_seen_client_is_evicted(self, monkeypatch):
+        """Entries are capped at rate_limit_max_clients, dropping the least recently seen client"""
+        self._patch_clock(monkeypatch)
+        self.settings.rate_limit_max_clients = 3
+        for client in ("10.0.0.1", "10.0.0.2", "10.0.0.3"):
+            assert check_local_rate_limit(client, self.settings)
+
+        # Seeing the first client again makes the second the eviction candidate
+        assert check_local_rate_limit("10.0.0.1", self.settings)
+        assert check_local_rate_limit("10.0.0.4", self.settings)
+
+        assert list(request_counts) == ["10.0.0.3", "10.0.0.1", "10.0.0.4"]
+
+        print("✓ LRU eviction bounds the client table")
+
+
+class TestRateLimitMiddleware:
+    """Test suite for the paths the rate limiter applies to"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.client = TestClient(main.app)
+
+    def test_only_api_routes_are_limited(self, monkeypatch):
+        """Docs, the frontend and static assets stay reachable for a throttled client"""
+        async def always_limited(client_ip):
+            return False
+
+        monkeypatch.setattr(main, "check_rate_limit", always_limited)
+
+        assert self.client.get("/openapi.json").status_code == 200
+        assert self.client.get("/docs").status_code == 200
+        assert self.client.get("/static/missing.js").status_code == 404
+        assert self.client.get("/search", params={"query": "reentrancy"}).status_code == 429
+        assert self.client.post("/chat", json={"message": "hi"}).status_code == 429
+
+        print("✓ Rate limit only applies to API routes")
@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Test suite for the semantic context cache
+Validates similarity matching and LRU eviction without external services
+"""
+
+import sys
+import os
+import numpy as np
+
+# Add parent directory to path to import the app package
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.semantic_cache import SemanticCache
+
+
+class TestSemanticCache:
+    """Test suite for SemanticCache lookups and eviction"""
+
+    def setup_method(self):
+        """Setup for each test method"""
+        self.rng = np.random.default_rng(0)
+        self.cache = SemanticCache(dimension=8, capacity=2, threshold=0.95)
+
+    def _vector(self):
+        return SemanticCache.normalize(self.rng.random(8))
+
+    def test_exact_and_near_match_hit(self):
+        """Identical and near-identical embeddings return the cached context"""
+        vector = self._vector()
+        self.cache.add(vector, "context-a")
+
+        assert self.cache.lookup(vector) == "context-a"
+        near = SemanticCache.normalize(vector + 0.001)
+        assert self.cache.lookup(near) == "context-a"
+
+        print("✓ Similar queries hit the cache")
+
+    def test_dissimilar_query_misses(self):
+        """Embeddings below the similarity threshold are cache misses"""
+        self.cache.add(SemanticCache.normalize(np.eye(8)[0]), "context-a")
+
+        assert self.cache.lookup(SemanticCache.normalize(np.eye(8)[1])) is None
+
+        print("✓ Dissimilar queries miss the cache")
+
+    def test_least_recently_used_is_evicted(self):
+        """The least recently used entry is replaced once capacity is reached"""
+        first, second, third = (SemanticCache.normalize(np.eye(8)[i]) for i in range(3))
+        self.cache.add(first, "first")
+        self.cache.add(second, "second")
+
+        # Touch the first entry so the second becomes the eviction candidate
+        assert self.cache.lookup(first) == "first"
+        self.cache.add(third, "third")
+
+        assert len(self.cache) == 2
+        assert self.cache.lookup(first) == "first"
+        assert self.cache.lookup(second) is None
+        assert self.cache.lookup(third) == "third"
+
+        print("✓ LRU eviction works correctly")
+
+    def test_cache_survives_restart(self, tmp_path):
+        """A saved cache is restored by a new instance pointed at the same path"""
+        vector = self._vector()
+        cache = SemanticCache(dimension=8, capacity=4, threshold=0.95, path=str(tmp_path))
+        cache.add(vector, "persisted")
+        cache.save()
+
+        restored = SemanticCache(dimension=8, capacity=4, threshold=0.95, path=str(tmp_path))
+
+        assert len(restored) == 1
+        assert restored.lookup(vector) == "persisted"
+
+        print("✓ Cache persisted and restored")
+
+    def test_concurrent_writers_leave_one_consistent_snapshot(self, tmp_path):
+        """The last save wins as a whole; embeddings are never paired with another writer's contexts"""
+        first_vector, second_vector = self._vector(), self._vector()
+        first = SemanticCache(dimension=8, capacity=1, threshold=0.95, path=str(tmp_path))
+        second = SemanticCache(dimension=8, capacity=1, threshold=0.95, path=str(tmp_path))
+        first.add(first_vector, "first")
+        second.add(second_vector, "second")
+        first.save()
+        second.save()
+
+        restored = SemanticCache(dimension=8, capacity=1, threshold=0.95, path=str(tmp_path))
+
+        assert restored.lookup(second_vector) == "second"
+        assert restored.lookup(first_vector) is None
+        assert [p.name for p in tmp_path.iterdir()] == ["cache.npz"]
+
+        print("✓ Saves replace the snapshot atomically")
+
+    def test_quantized_cache_matches_similar_queries(self):
+        """int8-quantized storage still separates similar and dissimilar queries"""
+        cache = SemanticCache(dimension=64, capacity=4, threshold=0.95, quantize=True)
+        vector = SemanticCache.normalize(self.rng.standard_normal(64))
+        cache.add(vector, "quantized")
+
+        assert cache.embeddings.dtype == np.int8
+        assert cache.lookup(vector) == "quantized"
+        assert cache.lookup(SemanticCache.normalize(self.rng.standard_normal(64))) is None
+
+        print("✓ Quantized cache lookups work correctly")
+
+    def test_quantized_scan_spans_blocks(self, monkeypatch):
+        """Blocked int8 scans find entries beyond the first block"""
+        monkeypatch.setattr("app.semantic_cache.QUANTIZED_BLOCK_ROWS", 2)
+        cache = SemanticCache(dimension=64, capacity=5, threshold=0.95, quantize=True)
+        vectors = [SemanticCache.normalize(self.rng.standard_normal(64)) for _ in range(5)]
+        for i, vector in enumerate(vectors):
+            cache.add(vector, f"context-{i}")
+
+        assert [cache.lookup(vector) for vector in vectors] == [f"context-{i}" for i in range(5)]
+
+        print("✓ Quantized scans cover every block")